@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2025 Iain Waugh
+All rights reserved.
+
+Load the generated catalog CSVs and index them for lookups.
+
+    cat = Catalog(".")
+    cat.lookup("PR1-01234")                      # by Part ID or MPN
+    cat.nearest("Resistors", "0603", "3k3", 3)   # closest values in a package
+    cat.nearest("Resistors", "0603", "3k3", min_stock=1)  # ... that are in stock
+"""
+import bisect
+import csv
+import os
+
+from values import to_numeric
+
+families = ["Resistors", "Capacitors"]
+
+
+class Catalog:
+    def __init__(self, directory=".", family_list=families):
+        self.directory = directory
+        self.family_list = family_list
+        self.load()
+
+    def filename(self, family):
+        return os.path.join(self.directory, family + ".csv")
+
+    def mtimes(self):
+        """Modification times of the catalog files, to see if they've changed."""
+        result = {}
+        for family in self.family_list:
+            try:
+                result[family] = os.stat(self.filename(family)).st_mtime_ns
+            except FileNotFoundError:
+                result[family] = None
+        return result
+
+    def changed(self):
+        return self.mtimes() != self.loaded_mtimes
+
+    def load(self):
+        """(Re)read every family's CSV and rebuild the indexes."""
+        self.loaded_mtimes = self.mtimes()
+        self.rows = {}
+        self.by_id = {}
+        self.by_mpn = {}
+        # (family, package) -> (sorted numeric values, rows in the same order)
+        self.by_package = {}
+
+        for family in self.family_list:
+            if self.loaded_mtimes[family] is None:
+                continue
+            with open(self.filename(family), newline="") as csv_file:
+                rows = list(csv.DictReader(csv_file))
+            self.rows[family] = self.index(family, rows)
+
+    def index(self, family, rows):
+        """
+        Index a family's rows and return the ones that were indexed.
+
+        Malformed rows (too few or too many fields) are skipped.
+        """
+        # csv.DictReader fills short rows with None, and puts extra fields under None
+        rows = [row for row in rows if None not in row and None not in row.values()]
+        for row in rows:
+            row["Family"] = family
+        numbers = to_numeric([row["Value"] for row in rows])
+        groups = {}
+        for row, n in zip(rows, numbers):
+            self.by_id[row["Part ID"]] = row
+            for mpn in row["MPNs"].split(";"):
+                if mpn:
+                    self.by_mpn[mpn] = row
+            if n == n:  # Skip NaN
+                groups.setdefault(row["Package"], []).append((n, row))
+
+        for package, pairs in groups.items():
+            # Sort by value, then Part ID so that the order is deterministic
+            pairs.sort(key=lambda p: (p[0], p[1]["Part ID"]))
+            self.by_package[(family, package)] = (
+                [p[0] for p in pairs],
+                [p[1] for p in pairs],
+            )
+        return rows
+
+    def lookup(self, key):
+        """Return the row for a Part ID or MPN, or None."""
+        row = self.by_id.get(key)
+        if row is None:
+            row = self.by_mpn.get(key)
+        return row
+
+    def nearest(self, family, package, value, count=1, min_stock=None):
+        """
+        Return up to 'count' rows in a family/package, closest to 'value' first.
+
+        'value' can be a number or a value string like "3k3" or "100nF".
+        Raises ValueError if it isn't a value.
+        With 'min_stock', only rows with at least that much in the Stock column
+        are returned (an empty Stock counts as 0).
+        """
+        if isinstance(value, str):
+            value = to_numeric([value])[0]
+        if value != value:  # NaN
+            raise ValueError("not a value")
+        numbers, rows = self.by_package.get((family, package), ([], []))
+
+        # Walk outwards from where 'value' would be inserted
+        hi = bisect.bisect_left(numbers, value)
+        lo = hi - 1
+        result = []
+        while len(result) < count and (lo >= 0 or hi < len(numbers)):
+            if hi >= len(numbers) or (lo >= 0 and value - numbers[lo] <= numbers[hi] - value):
+                row = rows[lo]
+                lo -= 1
+            else:
+                row = rows[hi]
+                hi += 1
+            if min_stock is None or int(row.get("Stock") or 0) >= min_stock:
+                result.append(row)
+        return result
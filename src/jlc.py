@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2025 Iain Waugh
+All rights reserved.
+
+Fill in real prices and stock levels from the JLC parts database.
+
+The database is the 'cache.sqlite3' from https://yaqwsx.github.io/jlcparts/
+(see docs/Method.md for how to download it).  It's several GB, so rather than
+looking up one MPN at a time, the catalog's MPNs are put in a temporary table
+and SQLite joins that against the components table in one pass.
+
+Either annotate the rows as they're generated:
+
+    python make_res_csv.py --jlc cache.sqlite3
+
+or annotate CSVs that have already been made:
+
+    python jlc.py cache.sqlite3 Resistors.csv Capacitors.csv
+"""
+import argparse
+import csv
+import json
+import sqlite3
+
+from sinks import CsvSink
+
+
+def format_prices(price_json):
+    """
+    Turn JLC's price breaks into our 'Prices' format:
+    '[{"qFrom": 1, "qTo": 9, "price": 0.01}, {"qFrom": 10, ...}]' -> '1:0.01;10:...'
+    """
+    try:
+        breaks = json.loads(price_json or "[]")
+    except ValueError:
+        return ""
+    return ";".join(str(b["qFrom"]) + ":" + format(b["price"], "g") for b in breaks)
+
+
+def load_jlc(db_filename, mpns):
+    """
+    Return {MPN: (prices, stock)} for the MPNs that JLC has.
+
+    Where JLC has several listings for one MPN, the one with the most stock wins.
+    """
+    # Read-only, so that a mistake here can't damage the (slow to download) cache
+    conn = sqlite3.connect("file:" + db_filename + "?mode=ro", uri=True)
+    try:
+        conn.execute("CREATE TEMP TABLE wanted (mpn TEXT PRIMARY KEY)")
+        conn.executemany("INSERT OR IGNORE INTO temp.wanted VALUES (?)", ((m,) for m in mpns if m))
+        query = """
+            SELECT c.mfr, c.price, c.stock
+            FROM temp.wanted AS w
+            JOIN components AS c ON c.mfr = w.mpn
+            ORDER BY c.mfr, c.stock
+        """
+        # Ordered by stock, so the last listing for each MPN is the best stocked
+        result = {}
+        for mpn, price, stock in conn.execute(query):
+            result[mpn] = (format_prices(price), str(stock or 0))
+        return result
+    finally:
+        conn.close()
+
+
+def annotate(header, rows, db_filename):
+    """
+    Fill in the 'Prices' and 'Stock' columns of 'rows' (a list, changed in place).
+
+    Rows whose MPN isn't in the JLC database get empty Prices and Stock, so
+    that the generators' placeholder prices can't pass for JLC data.
+    Returns the number of rows that were found at JLC.
+    """
+    missing = [c for c in ("MPNs", "Prices", "Stock") if c not in header]
+    if missing:
+        raise ValueError(
+            "No " + ", ".join(missing) + " column; regenerate the CSV with make_*_csv.py first"
+        )
+    mpn_col = header.index("MPNs")
+    prices_col = header.index("Prices")
+    stock_col = header.index("Stock")
+    # A row can list several MPNs; the first one JLC has is used
+    mpns = {m for row in rows for m in row[mpn_col].split(";")}
+    jlc = load_jlc(db_filename, mpns)
+
+    count = 0
+    for row in rows:
+        for mpn in row[mpn_col].split(";"):
+            if mpn in jlc:
+                row[prices_col], row[stock_col] = jlc[mpn]
+                count += 1
+                break
+        else:
+            row[prices_col], row[stock_col] = "", ""
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Add JLC prices and stock to catalog CSVs")
+    parser.add_argument("db", help="the jlcparts cache.sqlite3")
+    parser.add_argument("csv_files", nargs="+", help="catalog CSVs to update in place")
+    args = parser.parse_args()
+
+    for filename in args.csv_files:
+        with open(filename, newline="") as csv_file:
+            header, *rows = list(csv.reader(csv_file))
+        try:
+            count = annotate(header, rows, args.db)
+        except ValueError as e:
+            parser.error(filename + ": " + str(e))
+        # Written to a temporary file and renamed, so an error can't truncate the CSV
+        sink = CsvSink(filename)
+        try:
+            sink.open(header)
+            sink.write(rows)
+        except BaseException:
+            sink.abort()
+            raise
+        sink.close()
+        print(filename + ": " + str(count) + " of " + str(len(rows)) + " parts found at JLC")
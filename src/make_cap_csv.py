@@ -12,8 +12,13 @@ This script deals with 3 different representations of values:
     Numeric value   (number): 4.7, 10000000, 1500, etc.
 """
 import re
+import argparse
+
 import pandas as pd
-import csv
+
+from jlc import annotate
+from mpn import mpn_templates
+from sinks import CsvSink, JsonLinesSink, ParquetSink, ShardedCsvSink, SqliteSink, fan_out
 
 
 def schem2text(value):
@@ -65,39 +70,9 @@ def str_mult(value, mult):
         )
 
 
-def yageo_code(size, tol, value, power):
-    tol_lookup = {
-        "0.1%": "B",
-        "0.5%": "D",
-        "1%": "F",
-        "5%": "J",
-        "10%": "K",
-        "20%": "M",
-    }
-    tol_code = tol_lookup[tol]
-
-    if size in ["2010"]:
-        packaging_code = "K"
-    else:
-        packaging_code = "R"
-
-    if power == "1/8W":
-        reel_code = "7W"
-    else:
-        reel_code = "07"
-
-    code = (
-        "RC"
-        + size
-        + tol_code
-        + packaging_code
-        + "-"
-        + reel_code
-        + value.upper().rstrip("0")
-        + "L"
-    )
-
-    return code
+def yageo_code(size, value, dielectric, voltage):
+    row = {"Package": size, "Value": value, "Dielectric": dielectric, "Voltage": voltage}
+    return mpn_templates[("Yageo", "Capacitors")].encode(row)
 
 
 # Weight will be rounded up/down to a precision of 1mg
@@ -146,7 +121,6 @@ datasheet_table = {
 }
 
 part_id_prefix = "PC1-"
-part_id_num = 0
 
 csv_columns = [
     [
@@ -166,11 +140,11 @@ csv_columns = [
         "Manufacturers",
         "MPNs",
         "Prices",
+        "Stock",
         "Datasheet",
         "RoHS",
     ]
 ]
-csv_data = csv_columns
 
 # Load the CSV file
 df = pd.read_csv("cap_chip_tables.csv", dtype=str, skip_blank_lines=True)
@@ -194,28 +168,32 @@ for _, row in df.iterrows():
                     }
                 )
 
-for cap in capacitors:
-    value = cap["Value"]
-    package = cap["Package"]
-    dielectric = cap["Dielectric"]
-    tol = temperatures_tbl[dielectric][2]
-    voltage = cap["Voltage"]
-    minC = temperatures_tbl[dielectric][0]
-    maxC = temperatures_tbl[dielectric][1]
-    height = cap["Height"]
-    weight = weights_g[package]
-    symbols = "Passives:C"
-    footprints = footprints_tbl[package]
-    prices = "100:0.01;20000:0.0003"
-    datasheet = datasheet_table[cap["Dielectric"]]
-    RoHS = "OK"
-    part_id = str(f"{part_id_prefix}%05d" % part_id_num)
-    part_id_num = part_id_num + 1
-    description = " ".join(["CAP", "CHIP", value, voltage, dielectric, tol, package])
-    manufacturers = "Yageo"
-    mpns = ""  # yageo_code(package, tol, value, dielectric)
-    csv_data.append(
-        [
+
+def make_rows():
+    """Generate one CSV row per capacitor, in Part ID order."""
+    part_id_num = 0
+    for cap in capacitors:
+        value = cap["Value"]
+        package = cap["Package"]
+        dielectric = cap["Dielectric"]
+        tol = temperatures_tbl[dielectric][2]
+        voltage = cap["Voltage"]
+        minC = temperatures_tbl[dielectric][0]
+        maxC = temperatures_tbl[dielectric][1]
+        height = cap["Height"]
+        weight = weights_g[package]
+        symbols = "Passives:C"
+        footprints = footprints_tbl[package]
+        prices = "100:0.01;20000:0.0003"
+        stock = ""
+        datasheet = datasheet_table[cap["Dielectric"]]
+        RoHS = "OK"
+        part_id = str(f"{part_id_prefix}%05d" % part_id_num)
+        part_id_num = part_id_num + 1
+        description = " ".join(["CAP", "CHIP", value, voltage, dielectric, tol, package])
+        manufacturers = "Yageo"
+        mpns = yageo_code(package, value, dielectric, voltage)
+        yield [
             part_id,
             description,
             value,
@@ -232,15 +210,41 @@ for cap in capacitors:
             manufacturers,
             mpns,
             prices,
+            stock,
             datasheet,
             RoHS,
         ]
-    )
 
-with open('Capacitors.csv', 'w', newline='') as csv_file:
-    writer = csv.writer(csv_file, quoting=csv.QUOTE_ALL)
-    writer.writerows(csv_data)
 
-#csv_df = pd.DataFrame(csv_data, columns=csv_columns)
-#csv_df.set_index("Part ID")
-#csv_df.to_csv("Capacitors.csv",header=True)
+# Generate the rows once and write them to every requested format
+parser = argparse.ArgumentParser(
+    description="Create Capacitors.csv (and optionally other formats)"
+)
+parser.add_argument(
+    "--sqlite", help="also write a 'Capacitors' table to this SQLite database"
+)
+parser.add_argument("--jsonl", help="also write this JSON lines file")
+parser.add_argument("--parquet", help="also write this Parquet file (needs pyarrow)")
+parser.add_argument("--shards", help="also write one CSV per package (or --shard-key) here")
+parser.add_argument("--shard-key", default="Package", help="column to shard on")
+parser.add_argument(
+    "--jlc", help="fill in prices and stock from this jlcparts cache.sqlite3"
+)
+args = parser.parse_args()
+
+rows = make_rows()
+if args.jlc:
+    # Needs every MPN up front, for one join against the JLC database
+    rows = list(rows)
+    annotate(csv_columns[0], rows, args.jlc)
+
+sinks = [CsvSink("Capacitors.csv")]
+if args.sqlite:
+    sinks.append(SqliteSink(args.sqlite, "Capacitors"))
+if args.jsonl:
+    sinks.append(JsonLinesSink(args.jsonl))
+if args.parquet:
+    sinks.append(ParquetSink(args.parquet))
+if args.shards:
+    sinks.append(ShardedCsvSink(args.shards, "Capacitors", args.shard_key))
+fan_out(csv_columns[0], rows, sinks)
@@ -12,9 +12,11 @@ This script deals with 3 different representations of values:
     Numeric value   (number): 4.7, 10000000, 1500, etc.
 """
 import re
-import csv
+import argparse
 
-import pandas as pd
+from jlc import annotate
+from mpn import mpn_templates
+from sinks import CsvSink, JsonLinesSink, ParquetSink, ShardedCsvSink, SqliteSink, fan_out
 
 def schem2text(value):
     """Convert 4k7 to 4.7k, 1R to 1, 22M to 22M etc."""
@@ -91,29 +93,8 @@ def gen_range(min_val, max_val, value_list):
     return result
 
 def yageo_code(size,tol,value,power):
-    tol_lookup = {
-        "0.1%" : "B",
-        "0.5%" : "D",
-        "1%" : "F",
-        "5%" : "J",
-        "10%" : "K",
-        "20%" : "M",
-        }
-    tol_code = tol_lookup[tol]
-    
-    if size in ["2010"]:
-        packaging_code = "K"
-    else:
-        packaging_code = "R"
-
-    if power == "1/8W":
-        reel_code = "7W"
-    else:
-        reel_code = "07"
-    
-    code = "RC" + size + tol_code + packaging_code + "-" + reel_code + value.upper().rstrip("0") + "L"
-    
-    return code
+    row = {"Package": size, "Tolerance": tol, "Value": value, "Power": power}
+    return mpn_templates[("Yageo", "Resistors")].encode(row)
 
 
 # # Define the data
@@ -278,49 +259,64 @@ footprints_tbl = {
     }
 
 part_id_prefix = "PR1-"
-part_id_num = 0
 
 csv_columns = [
-    ["Part ID","Description","Value","Tolerance","Power","Package","Height","Weight","Temp (min)","Temp (max)","Voltage","Symbols","Footprints","Manufacturers","MPNs","Prices","Datasheet","RoHS"]
+    ["Part ID","Description","Value","Tolerance","Power","Package","Height","Weight","Temp (min)","Temp (max)","Voltage","Symbols","Footprints","Manufacturers","MPNs","Prices","Stock","Datasheet","RoHS"]
     ]
-csv_data = csv_columns
 
-for key in ranges:
-    package,power,tol,voltage,minC,maxC = key.split(",")
-    min_val,max_val = ranges[key]
-    if tol == "5%":
-        part_list = gen_range(min_val, max_val, e24)
-    else:
-        part_list = gen_range(min_val, max_val, e96)
-    height=heights[package]
-    weight=weights_g[package]
-    symbols = "Passives:R"
-    footprints = footprints_tbl[package]
-    prices = "100:0.01;20000:0.0003"
-    datasheet = "https://www.yageo.com/upload/media/product/products/datasheet/rchip/PYu-RC_Group_51_RoHS_L_12.pdf"
-    RoHS = "OK"
-    
-    # if 5%, add Zero Ohm jumper
-    if tol == "5%":
-        value = "0R"
-        part_id = str(f"{part_id_prefix}%05d" % part_id_num)
-        part_id_num = part_id_num + 1
-        description = " ".join(["RES","CHIP",schem2text(value)+" OHM",tol,power,package])
-        manufacturers = "Yageo"
-        mpns = yageo_code(package, tol, value, power)
-        csv_data.append([part_id,description,value,tol,power,package,height,weight,minC,maxC,voltage,symbols,footprints,manufacturers,mpns,prices,datasheet,RoHS])
-    for value in part_list:
-        part_id = str(f"{part_id_prefix}%05d" % part_id_num)
-        part_id_num = part_id_num + 1
-        description = " ".join(["RES","CHIP",schem2text(value)+" OHM",tol,power,package])
-        manufacturers = "Yageo"
-        mpns = yageo_code(package, tol, value, power)
-        csv_data.append([part_id,description,value,tol,power,package,height,weight,minC,maxC,voltage,symbols,footprints,manufacturers,mpns,prices,datasheet,RoHS])
-
-with open('Resistors.csv', 'w', newline='') as csv_file:
-    writer = csv.writer(csv_file, quoting=csv.QUOTE_ALL)
-    writer.writerows(csv_data)
-
-    # csv_df = pd.DataFrame(csv_data, columns=csv_columns)
-    # csv_df.set_index("Part ID")
-    # csv_df.to_csv("Resistors.csv",header=True)
+def make_rows():
+    """Generate one CSV row per resistor, in Part ID order."""
+    part_id_num = 0
+    for key in ranges:
+        package,power,tol,voltage,minC,maxC = key.split(",")
+        min_val,max_val = ranges[key]
+        if tol == "5%":
+            part_list = gen_range(min_val, max_val, e24)
+        else:
+            part_list = gen_range(min_val, max_val, e96)
+        height=heights[package]
+        weight=weights_g[package]
+        symbols = "Passives:R"
+        footprints = footprints_tbl[package]
+        prices = "100:0.01;20000:0.0003"
+        stock = ""
+        datasheet = "https://www.yageo.com/upload/media/product/products/datasheet/rchip/PYu-RC_Group_51_RoHS_L_12.pdf"
+        RoHS = "OK"
+
+        # if 5%, add Zero Ohm jumper
+        if tol == "5%":
+            part_list = ["0R"] + part_list
+        for value in part_list:
+            part_id = str(f"{part_id_prefix}%05d" % part_id_num)
+            part_id_num = part_id_num + 1
+            description = " ".join(["RES","CHIP",schem2text(value)+" OHM",tol,power,package])
+            manufacturers = "Yageo"
+            mpns = yageo_code(package, tol, value, power)
+            yield [part_id,description,value,tol,power,package,height,weight,minC,maxC,voltage,symbols,footprints,manufacturers,mpns,prices,stock,datasheet,RoHS]
+
+# Generate the rows once and write them to every requested format
+parser = argparse.ArgumentParser(description="Create Resistors.csv (and optionally other formats)")
+parser.add_argument("--sqlite", help="also write a 'Resistors' table to this SQLite database")
+parser.add_argument("--jsonl", help="also write this JSON lines file")
+parser.add_argument("--parquet", help="also write this Parquet file (needs pyarrow)")
+parser.add_argument("--shards", help="also write one CSV per package (or --shard-key) here")
+parser.add_argument("--shard-key", default="Package", help="column to shard on")
+parser.add_argument("--jlc", help="fill in prices and stock from this jlcparts cache.sqlite3")
+args = parser.parse_args()
+
+rows = make_rows()
+if args.jlc:
+    # Needs every MPN up front, for one join against the JLC database
+    rows = list(rows)
+    annotate(csv_columns[0], rows, args.jlc)
+
+sinks = [CsvSink("Resistors.csv")]
+if args.sqlite:
+    sinks.append(SqliteSink(args.sqlite, "Resistors"))
+if args.jsonl:
+    sinks.append(JsonLinesSink(args.jsonl))
+if args.parquet:
+    sinks.append(ParquetSink(args.parquet))
+if args.shards:
+    sinks.append(ShardedCsvSink(args.shards, "Resistors", args.shard_key))
+fan_out(csv_columns[0], rows, sinks)
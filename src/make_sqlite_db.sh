@@ -20,6 +20,7 @@ CREATE TABLE Resistors (
     Manufacturers TEXT,
     MPNs          TEXT,
     Prices        TEXT,
+    Stock         TEXT,
     Datasheet     TEXT,
     RoHS          TEXT
 );
@@ -41,6 +42,7 @@ CREATE TABLE Capacitors (
     Manufacturers TEXT,
     MPNs          TEXT,
     Prices        TEXT,
+    Stock         TEXT,
     Datasheet     TEXT,
     RoHS          TEXT
 );
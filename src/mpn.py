@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2025 Iain Waugh
+All rights reserved.
+
+Manufacturer part numbers (MPNs), built from declarative templates.
+
+Each vendor/family scheme is a format string plus a description of how to fill
+in each of its fields from a catalog row (keyed by the CSV column names):
+
+    "source"  : the column (or tuple of columns) the field comes from
+    "table"   : a lookup table from the source value to the code
+    "default" : the code when the source isn't in the table
+                (without a default, an unknown source is a KeyError)
+    "encode"  : a function to call on the source value instead of a table
+
+The templates are compiled once, when this module is imported.  Each field
+keeps a cache of the codes it has already made, so a whole catalog is encoded
+with one dict lookup per field per row.
+
+    mpn_templates[("Yageo", "Resistors")].encode({"Package": "0603", ...})
+    mpn_templates[("Yageo", "Resistors")].encode_all(catalog.rows["Resistors"])
+"""
+from decimal import Decimal
+
+from values import to_numeric
+
+
+def multiplier_code(value, sig):
+    """
+    Encode a value as 'sig' significant digits and a multiplier digit:
+    10000 -> "1002" (sig=3), 100000 -> "104" (sig=2).
+
+    Values too small for that use "R" as the decimal point instead:
+    4.7 -> "4R70" (sig=3), 1 -> "1R0" (sig=2).
+    """
+    if isinstance(value, str):
+        d = to_numeric([value], exact=True)[0]
+    else:
+        # Via str(), so that 4.7 is Decimal("4.7") and not its binary expansion
+        d = Decimal(str(value))
+    if d == 0:
+        return "0" * (sig + 1)
+    if d < 10 ** (sig - 1):
+        whole, _, frac = format(d.normalize(), "f").partition(".")
+        return whole + "R" + frac.ljust(sig - len(whole), "0")
+    exponent = d.adjusted() - (sig - 1)
+    return str(int(d.scaleb(-exponent))) + str(exponent)
+
+
+def _picofarads(value):
+    """'100nF' -> Decimal('100000')"""
+    return to_numeric([value], exact=True)[0].scaleb(12)
+
+
+yageo_tol = {
+    "0.1%": "B",
+    "0.5%": "D",
+    "1%": "F",
+    "5%": "J",
+    "10%": "K",
+    "20%": "M",
+}
+
+# Yageo RC_L series thick film chip resistors: RC0603FR-0710KL
+yageo_rc = {
+    "format": "RC{package}{tol}{packaging}-{reel}{value}L",
+    "fields": {
+        "package": {"source": "Package", "encode": str},
+        "tol": {"source": "Tolerance", "table": yageo_tol},
+        "packaging": {"source": "Package", "table": {"2010": "K"}, "default": "R"},
+        "reel": {"source": "Power", "table": {"1/8W": "7W"}, "default": "07"},
+        "value": {"source": "Value", "encode": lambda v: v.upper().rstrip("0")},
+    },
+}
+
+# Yageo CC series MLCCs: CC0402KRX7R9BB104
+#   The catalog's "Tolerance" column for capacitors is the temperature
+#   characteristic, so the capacitance tolerance is the usual one for each
+#   dielectric (NP0 below 10pF is +/-0.25pF).
+yageo_cc = {
+    "format": "CC{package}{tol}R{dielectric}{voltage}B{series}{value}",
+    "fields": {
+        "package": {"source": "Package", "encode": str},
+        "tol": {
+            "source": ("Dielectric", "Value"),
+            "encode": lambda d, v: {"X5R": "K", "X7R": "K", "Y5V": "Z"}.get(d)
+            or ("C" if _picofarads(v) < 10 else "J"),
+        },
+        "dielectric": {
+            "source": "Dielectric",
+            "table": {"NP0": "NPO", "X5R": "X5R", "X7R": "X7R", "Y5V": "Y5V"},
+        },
+        "voltage": {
+            "source": "Voltage",
+            "table": {
+                "4V": "4",
+                "6.3V": "5",
+                "10V": "6",
+                "16V": "7",
+                "25V": "8",
+                "50V": "9",
+                "100V": "0",
+                "200V": "A",
+                "250V": "Y",
+            },
+        },
+        "series": {"source": "Dielectric", "table": {"NP0": "N"}, "default": "B"},
+        "value": {"source": "Value", "encode": lambda v: multiplier_code(_picofarads(v), 2)},
+    },
+}
+
+class MpnTemplate:
+    """A compiled MPN template; see the module docstring for the spec format."""
+
+    def __init__(self, spec):
+        self.format = spec["format"]
+        # One (source columns, encoder, cache) per field, in format-string order
+        self.fields = []
+        for name, field in spec["fields"].items():
+            source = field["source"]
+            columns = source if isinstance(source, tuple) else (source,)
+            self.fields.append((name, columns, self.compile_field(field), {}))
+
+    @staticmethod
+    def compile_field(field):
+        """Turn a field spec into a function from a tuple of source values to a code."""
+        if "encode" in field:
+            encode = field["encode"]
+            return lambda v: encode(*v)
+        table = {(k if isinstance(k, tuple) else (k,)): v for k, v in field["table"].items()}
+        if "default" in field:
+            default = field["default"]
+            return lambda v: table.get(v, default)
+        return lambda v: table[v]
+
+    def encode(self, row):
+        """Return the MPN for one row (a dict keyed by CSV column names)."""
+        codes = {}
+        for name, columns, encode, cache in self.fields:
+            key = tuple(row[c] for c in columns)
+            code = cache.get(key)
+            if code is None:
+                code = cache[key] = encode(key)
+            codes[name] = code
+        return self.format.format_map(codes)
+
+    def encode_all(self, rows):
+        """Return the MPNs for a whole list of rows."""
+        return [self.encode(row) for row in rows]
+
+
+mpn_templates = {
+    ("Yageo", "Resistors"): MpnTemplate(yageo_rc),
+    ("Yageo", "Capacitors"): MpnTemplate(yageo_cc),
+}
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2025 Iain Waugh
+All rights reserved.
+
+A local lookup service that keeps the catalog loaded and indexed in memory.
+
+Tools that make lots of small lookups (design-rule scripts, editor plugins)
+can ask this instead of re-reading the catalog CSVs every time.  It only
+listens on localhost or a Unix socket and never goes out to the network.
+The catalog is reloaded when the CSV files change.
+
+    python part_server.py --port 8765
+    python part_server.py --socket /tmp/kicad_parts.sock
+
+Requests and replies are JSON:
+
+    GET  /health
+    GET  /part/PR1-01234
+    POST /lookup   {"keys": ["PR1-01234", "RC0603FR-073K3L"]}
+    POST /search   {"queries": [{"family": "Resistors", "package": "0603",
+                                 "value": "3k3", "count": 3, "min_stock": 1}]}
+
+/lookup accepts a Part ID or an MPN for each key and replies with a list of
+rows (or null).  /search replies with a list of row lists, one per query;
+"count" and "min_stock" are optional.
+"""
+import argparse
+import json
+import os
+import socketserver
+import stat
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+from catalog import Catalog
+
+
+class Handler(BaseHTTPRequestHandler):
+    def address_string(self):
+        # Unix socket clients don't have an address
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def reply(self, code, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        catalog = self.server.catalog
+        if self.path == "/health":
+            self.reply(200, {"parts": len(catalog.by_id), "files": catalog.loaded_mtimes})
+        elif self.path.startswith("/part/"):
+            row = catalog.lookup(unquote(self.path[len("/part/") :]))
+            if row is None:
+                self.reply(404, {"error": "not found"})
+            else:
+                self.reply(200, row)
+        else:
+            self.reply(404, {"error": "unknown path: " + self.path})
+
+    def do_POST(self):
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError as e:
+            self.reply(400, {"error": "bad JSON: " + str(e)})
+            return
+
+        # Take one reference, so a reload part way through doesn't mix catalogs
+        catalog = self.server.catalog
+        try:
+            if self.path == "/lookup":
+                self.reply(200, [catalog.lookup(k) for k in request["keys"]])
+            elif self.path == "/search":
+                result = []
+                for q in request["queries"]:
+                    rows = catalog.nearest(
+                        q["family"], q["package"], q["value"], q.get("count", 1), q.get("min_stock")
+                    )
+                    result.append(rows)
+                self.reply(200, result)
+            else:
+                self.reply(404, {"error": "unknown path: " + self.path})
+        except (KeyError, TypeError, ValueError) as e:
+            self.reply(400, {"error": "bad request: " + repr(e)})
+
+
+class PartServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class UnixPartServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def watch(server, interval):
+    """
+    Reload the catalog whenever its files change.
+
+    If a reload fails (e.g. a file is half written), the old catalog is kept
+    and the reload is tried again on the next check.  A failure is only
+    logged once for each version of the files.
+    """
+    failed_mtimes = None
+    while True:
+        time.sleep(interval)
+        try:
+            if server.catalog.changed():
+                # Build the new catalog on the side, then swap it in
+                server.catalog = Catalog(server.catalog.directory, server.catalog.family_list)
+                failed_mtimes = None
+        except Exception as e:
+            mtimes = server.catalog.mtimes()
+            if mtimes != failed_mtimes:
+                failed_mtimes = mtimes
+                sys.stderr.write("Catalog reload failed, keeping the old one: " + repr(e) + "\n")
+
+
+def make_server(catalog, port=8765, socket_path=None, interval=1.0, quiet=False):
+    """Create (but don't start) a server for 'catalog'.  Use port=0 for any free port."""
+    if socket_path:
+        # Only remove a socket left over from an earlier run, never a file
+        if os.path.exists(socket_path):
+            if not stat.S_ISSOCK(os.stat(socket_path).st_mode):
+                raise FileExistsError(socket_path + " exists and isn't a socket")
+            os.remove(socket_path)
+        server = UnixPartServer(socket_path, Handler)
+    else:
+        server = PartServer(("127.0.0.1", port), Handler)
+    server.catalog = catalog
+    server.quiet = quiet
+    if interval:
+        threading.Thread(target=watch, args=(server, interval), daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve part lookups from a warm catalog")
+    parser.add_argument("--dir", default=".", help="directory holding the catalog CSVs")
+    parser.add_argument("--port", type=int, default=8765, help="localhost port")
+    parser.add_argument("--socket", help="listen on this Unix socket instead of a port")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between reload checks")
+    args = parser.parse_args()
+
+    try:
+        server = make_server(Catalog(args.dir), args.port, args.socket, args.interval)
+    except FileExistsError as e:
+        parser.error(str(e))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
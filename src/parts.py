@@ -11,6 +11,9 @@ This  deals with 3 different representations of values (as strings):
 """
 
 import re
+from functools import cached_property
+
+from mpn import mpn_templates
 
 
 class Series:
@@ -105,36 +108,44 @@ class Series:
 
 
 class Part:
+    """
+    Base class for parts.
+
+    Derived fields (description, footprints, MPNs, etc.) are cached properties
+    in the subclasses, so they're only worked out if something reads them.
+    Creating a Part just stores its parameters, which keeps bulk filtering cheap.
+    These class attributes are the defaults for fields a part doesn't have.
+    """
 
-    def __init__(self):
-        self.part_prefix = "P"
-        self.package = ""
-        self.height = ""
-        self.weight = ""
-        self.min_c = ""
-        self.max_c = ""
-        self.symbols = ""
-        self.footprints = ""
-        self.manufacturers = ""
-        self.mpns = ""
-        self.prices = ""
-        self.datasheet = ""
-        self.RoHS = ""
-        self.field_pre = ["Part ID", "Description"]
-        self.field_post = [
-            "Height",
-            "Weight",
-            "Temp (min)",
-            "Temp (max)",
-            "Voltage",
-            "Symbols",
-            "Footprints",
-            "Manufacturers",
-            "MPNs",
-            "Prices",
-            "Datasheet",
-            "RoHS",
-        ]
+    part_prefix = "P"
+    package = ""
+    height = ""
+    weight = ""
+    min_c = ""
+    max_c = ""
+    symbols = ""
+    footprints = ""
+    manufacturers = ""
+    mpns = ""
+    prices = ""
+    datasheet = ""
+    RoHS = ""
+    # Tuples, so that no part can change the column lists of every other part
+    field_pre = ("Part ID", "Description")
+    field_post = (
+        "Height",
+        "Weight",
+        "Temp (min)",
+        "Temp (max)",
+        "Voltage",
+        "Symbols",
+        "Footprints",
+        "Manufacturers",
+        "MPNs",
+        "Prices",
+        "Datasheet",
+        "RoHS",
+    )
 
     def get_id(self):
         return self.part_id
@@ -155,9 +166,65 @@ class Part:
 
 
 class Resistor(Part):
+    part_prefix = Part.part_prefix + "R1"
+    fields = (
+        Part.field_pre
+        + ("Value", "Tolerance", "Power", "Package", "Working Voltage")
+        + Part.field_post
+    )
+    symbols = "Passives:R"
+    manufacturers = "Yageo"
+    prices = "100:0.01;20000:0.0003"
+    datasheet = "https://www.yageo.com/upload/media/product/products/datasheet/rchip/PYu-RC_Group_51_RoHS_L_12.pdf"
+    RoHS = "OK"
+
+    height_table = {
+        "0075": "0.10",
+        "0100": "0.13",
+        "0201": "0.23",
+        "0402": "0.35",
+        "0603": "0.45",
+        "0805": "0.50",
+        "1206": "0.55",
+        "1210": "0.50",
+        "1218": "0.55",
+        "2010": "0.55",
+        "2512": "0.55",
+    }
+
+    # Weight will be rounded up/down to a precision of 1mg
+    #   so values of 0402 and smaller will be 0
+    #   (a through hole via weighs more)
+    weight_table = {
+        "0075": "0.0",  # "0.00004",
+        "0100": "0.0",  # "0.0001",
+        "0201": "0.0",  # "0.0002",
+        "0402": "0.0",  # "0.0006",
+        "0603": "0.002",
+        "0805": "0.004",
+        "1206": "0.010",
+        "1210": "0.016",
+        "1218": "0.027",
+        "2010": "0.027",
+        "2512": "0.045",
+    }
+
+    # Use standard KiCad SMD resistor footprints
+    footprints_table = {
+        #    "0075" : "Resistor_SMD:R_unavailable",
+        "0100": "Resistor_SMD:R_01005_0402Metric;Resistor_SMD:R_01005_0402Metric_Pad0.57x0.30mm_HandSolder",
+        "0201": "Resistor_SMD:R_0201_0603Metric;Resistor_SMD:R_0201_0603Metric_Pad0.64x0.40mm_HandSolder",
+        "0402": "Resistor_SMD:R_0402_1005Metric;Resistor_SMD:R_0402_1005Metric_Pad0.72x0.64mm_HandSolder",
+        "0603": "Resistor_SMD:R_0603_1608Metric;Resistor_SMD:R_0603_1608Metric_Pad0.98x0.95mm_HandSolder",
+        "0805": "Resistor_SMD:R_0805_2012Metric;Resistor_SMD:R_0805_2012Metric_Pad1.20x1.40mm_HandSolder",
+        "1206": "Resistor_SMD:R_1206_3216Metric;Resistor_SMD:R_1206_3216Metric_Pad1.30x1.75mm_HandSolder",
+        "1210": "Resistor_SMD:R_1210_3225Metric;Resistor_SMD:R_1210_3225Metric_Pad1.30x2.65mm_HandSolder",
+        "1218": "Resistor_SMD:R_1218_3246Metric;Resistor_SMD:R_1218_3246Metric_Pad1.22x4.75mm_HandSolder",
+        "2010": "Resistor_SMD:R_2010_5025Metric;Resistor_SMD:R_2010_5025Metric_Pad1.40x2.65mm_HandSolder",
+        "2512": "Resistor_SMD:R_2512_6332Metric;Resistor_SMD:R_2512_6332Metric_Pad1.40x3.35mm_HandSolder",
+    }
+
     def __init__(self, value_sch, package, power, tol, voltage, min_c, max_c):
-        super().__init__()
-        self.part_prefix = self.part_prefix + "R1"
         self.value = value_sch
         self.package = package
         self.power = power
@@ -165,96 +232,45 @@ class Resistor(Part):
         self.voltage = voltage
         self.min_c = min_c
         self.max_c = max_c
-        self.description = " ".join(
-            ["RES", "CHIP", self.schem2text(value_sch) + " OHM", tol, power, package]
-        )
-        self.fields = (
-            self.field_pre
-            + ["Value", "Tolerance", "Power", "Package", "Working Voltage"]
-            + self.field_post
-        )
 
-        height_table = {
-            "0075": "0.10",
-            "0100": "0.13",
-            "0201": "0.23",
-            "0402": "0.35",
-            "0603": "0.45",
-            "0805": "0.50",
-            "1206": "0.55",
-            "1210": "0.50",
-            "1218": "0.55",
-            "2010": "0.55",
-            "2512": "0.55",
-        }
-        self.height = height_table[package]
-
-        # Weight will be rounded up/down to a precision of 1mg
-        #   so values of 0402 and smaller will be 0
-        #   (a through hole via weighs more)
-        weight_table = {
-            "0075": "0.0",  # "0.00004",
-            "0100": "0.0",  # "0.0001",
-            "0201": "0.0",  # "0.0002",
-            "0402": "0.0",  # "0.0006",
-            "0603": "0.002",
-            "0805": "0.004",
-            "1206": "0.010",
-            "1210": "0.016",
-            "1218": "0.027",
-            "2010": "0.027",
-            "2512": "0.045",
-        }
-        self.weight = weight_table[package]
-        self.symbols = "Passives:R"
-
-        # Use standard KiCad SMD resistor footprints
-        footprints_table = {
-            #    "0075" : "Resistor_SMD:R_unavailable",
-            "0100": "Resistor_SMD:R_01005_0402Metric;Resistor_SMD:R_01005_0402Metric_Pad0.57x0.30mm_HandSolder",
-            "0201": "Resistor_SMD:R_0201_0603Metric;Resistor_SMD:R_0201_0603Metric_Pad0.64x0.40mm_HandSolder",
-            "0402": "Resistor_SMD:R_0402_1005Metric;Resistor_SMD:R_0402_1005Metric_Pad0.72x0.64mm_HandSolder",
-            "0603": "Resistor_SMD:R_0603_1608Metric;Resistor_SMD:R_0603_1608Metric_Pad0.98x0.95mm_HandSolder",
-            "0805": "Resistor_SMD:R_0805_2012Metric;Resistor_SMD:R_0805_2012Metric_Pad1.20x1.40mm_HandSolder",
-            "1206": "Resistor_SMD:R_1206_3216Metric;Resistor_SMD:R_1206_3216Metric_Pad1.30x1.75mm_HandSolder",
-            "1210": "Resistor_SMD:R_1210_3225Metric;Resistor_SMD:R_1210_3225Metric_Pad1.30x2.65mm_HandSolder",
-            "1218": "Resistor_SMD:R_1218_3246Metric;Resistor_SMD:R_1218_3246Metric_Pad1.22x4.75mm_HandSolder",
-            "2010": "Resistor_SMD:R_2010_5025Metric;Resistor_SMD:R_2010_5025Metric_Pad1.40x2.65mm_HandSolder",
-            "2512": "Resistor_SMD:R_2512_6332Metric;Resistor_SMD:R_2512_6332Metric_Pad1.40x3.35mm_HandSolder",
-        }
-        self.footprints = footprints_table[package]
-        self.manufacturers = "Yageo"
-        self.mpns = self.yageo_code()
-        self.prices = "100:0.01;20000:0.0003"
-        self.datasheet = "https://www.yageo.com/upload/media/product/products/datasheet/rchip/PYu-RC_Group_51_RoHS_L_12.pdf"
-        self.RoHS = "OK"
+    @cached_property
+    def description(self):
+        return " ".join(
+            [
+                "RES",
+                "CHIP",
+                self.schem2text(self.value) + " OHM",
+                self.tol,
+                self.power,
+                self.package,
+            ]
+        )
 
-    def yageo_code(self):
-        """Return the Yageo part number for this resistor."""
-        tol_lookup = {
-            "0.1%": "B",
-            "0.5%": "D",
-            "1%": "F",
-            "5%": "J",
-            "10%": "K",
-            "20%": "M",
-        }
-        tol_code = tol_lookup[self.tol]
+    @cached_property
+    def height(self):
+        return self.height_table[self.package]
 
-        if self.package in ["2010"]:
-            packaging_code = "K"
-        else:
-            packaging_code = "R"
+    @cached_property
+    def weight(self):
+        return self.weight_table[self.package]
 
-        if self.power == "1/8W":
-            reel_code = "7W"
-        else:
-            reel_code = "07"
+    @cached_property
+    def footprints(self):
+        return self.footprints_table[self.package]
 
-        value = self.value.upper().rstrip("0")
+    @cached_property
+    def mpns(self):
+        return self.yageo_code()
 
-        code = "RC" + self.package + tol_code + packaging_code + "-" + reel_code + value + "L"
-        return code
+    def yageo_code(self):
+        """Return the Yageo part number for this resistor."""
+        row = {
+            "Package": self.package,
+            "Tolerance": self.tol,
+            "Value": self.value,
+            "Power": self.power,
+        }
+        return mpn_templates[("Yageo", "Resistors")].encode(row)
 
 if __name__ == "__main__":
     r = Resistor("1R0", "0402", "1/16W", "1%", "50V", "-55", "155")
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2025 Iain Waugh
+All rights reserved.
+
+Parametric range queries over the catalog, like:
+
+    "all 0603 resistors from 4k to 5k, at most 1% tolerance,
+     at least 1/10W, working voltage at least 75V"
+
+    engine = QueryEngine(Catalog("."))
+    rows = engine.query("Resistors", package="0603", value=("4k", "5k"),
+                        tolerance=(None, "1%"), power=("1/10W", None), voltage=("75V", None))
+
+or from the command line (writes CSV to stdout):
+
+    python query.py Resistors --package 0603 --value 4k:5k --tolerance :1% \\
+        --power 1/10W: --voltage 75V:
+
+The Value, Tolerance, Power and Voltage strings are turned into numbers once,
+when the engine is built.  For each family/package, every field has a sorted
+index, so each range is a binary search giving a slice of row numbers, and a
+compound query is the intersection of those slices.
+
+Capacitors can't be searched by tolerance: their Tolerance column holds the
+temperature characteristic ("15%" for X7R, "30ppm/C" for NP0), not the
+capacitance tolerance.
+"""
+import argparse
+import csv
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+
+from catalog import Catalog
+from values import to_numeric
+
+si_prefix = {"m": 1e-3, "": 1, "k": 1e3}
+
+
+def _percent(text):
+    """'1%' -> 1.0, '+22% -82%' -> 82.0 (the worst case).  'ppm/C' isn't a tolerance."""
+    found = re.findall(r"([\d.]+)%", text)
+    return max(float(f) for f in found) if found else np.nan
+
+
+def _watts(text):
+    """'1/10W' -> 0.1, '3/4W' -> 0.75, '2W' -> 2.0, '250mW' -> 0.25"""
+    m = re.fullmatch(r"(\d+(?:\.\d+)?)(?:/(\d+))?([mk]?)W", text.replace(" ", ""))
+    if m is None:
+        return np.nan
+    n = float(m[1]) / float(m[2] or 1)
+    return n * si_prefix[m[3]]
+
+
+def _volts(text):
+    """'75V' -> 75.0, '6.3V' -> 6.3, '1.5kV' -> 1500.0"""
+    m = re.fullmatch(r"(\d+(?:\.\d+)?)([mk]?)V", text.replace(" ", ""))
+    return float(m[1]) * si_prefix[m[2]] if m else np.nan
+
+
+def _column(strings, parse):
+    """Parse each distinct string once and spread the results over the column."""
+    codes, uniques = pd.factorize(np.asarray(strings, dtype=object))
+    return np.array([parse(u) for u in uniques], dtype=float)[codes]
+
+
+# Query argument -> (CSV column, column parser)
+fields = {
+    "value": ("Value", to_numeric),
+    "tolerance": ("Tolerance", lambda col: _column(col, _percent)),
+    "power": ("Power", lambda col: _column(col, _watts)),
+    "voltage": ("Voltage", lambda col: _column(col, _volts)),
+}
+
+# Fields that mean something else in some families, so aren't indexed there.
+# A capacitor's "Tolerance" is its temperature characteristic ("15%", "30ppm/C").
+family_skip = {"Capacitors": {"tolerance"}}
+
+
+def parse_bound(field, bound):
+    """
+    Turn one end of a range ("4k", "1%", "1/10W", "75V" or a number) into a number.
+
+    Raises ValueError if it isn't one.
+    """
+    if bound is None or bound == "":
+        return None
+    if not isinstance(bound, str):
+        return float(bound)
+    number = float(fields[field][1]([bound])[0])
+    if number != number:  # NaN
+        raise ValueError("Bad " + field + " '" + bound + "'")
+    return number
+
+
+class PackageIndex:
+    """The rows of one family/package, with a sorted index on each field."""
+
+    def __init__(self, rows, skip=()):
+        self.rows = rows
+        self.sorted = {}
+        for field, (column, parse) in fields.items():
+            if column not in rows[0] or field in skip:
+                continue
+            numbers = parse([row[column] for row in rows])
+            # NaN sorts last; 'valid' is where the numbers stop
+            order = np.argsort(numbers, kind="stable")
+            valid = int(np.count_nonzero(~np.isnan(numbers)))
+            self.sorted[field] = (numbers[order], order, valid)
+
+    def select(self, field, lo, hi):
+        """Row numbers with lo <= field <= hi (either end can be None)."""
+        if field not in self.sorted:
+            # e.g. capacitors don't have a power rating, so nothing matches
+            return np.empty(0, dtype=int)
+        numbers, order, valid = self.sorted[field]
+        start = 0 if lo is None else np.searchsorted(numbers[:valid], lo, side="left")
+        end = valid if hi is None else np.searchsorted(numbers[:valid], hi, side="right")
+        return order[start:end]
+
+
+class QueryEngine:
+    def __init__(self, catalog):
+        self.catalog = catalog
+        # (family, package) -> PackageIndex
+        self.packages = {}
+        for family, rows in catalog.rows.items():
+            groups = {}
+            for row in rows:
+                groups.setdefault(row["Package"], []).append(row)
+            for package, package_rows in groups.items():
+                self.packages[(family, package)] = PackageIndex(
+                    package_rows, family_skip.get(family, ())
+                )
+
+    def query(self, family, package=None, **ranges):
+        """
+        Return the rows of 'family' that satisfy every range, sorted by value.
+
+        package : a package like "0603", or None for every package
+        ranges  : field=(min, max) for any of value, tolerance, power, voltage.
+                  Either end can be None; ends can be numbers or strings
+                  like "4k7", "1%", "1/10W" or "75V".
+
+        Raises ValueError for an unknown field, a range that isn't a (min, max)
+        pair, a bound that isn't a value, or a field that 'family' doesn't
+        have in that sense (e.g. Capacitors' Tolerance).
+        """
+        bounds = {}
+        for field, bound in ranges.items():
+            if field not in fields:
+                raise ValueError("Unknown field '" + field + "'; use one of " + ", ".join(fields))
+            if field in family_skip.get(family, ()):
+                raise ValueError(family + " can't be searched by " + field)
+            if not isinstance(bound, (tuple, list)) or len(bound) != 2:
+                raise ValueError(
+                    "The " + field + " range must be a (min, max) pair, not " + repr(bound)
+                )
+            lo, hi = bound
+            bounds[field] = (parse_bound(field, lo), parse_bound(field, hi))
+
+        result = []
+        for (fam, pkg), index in sorted(self.packages.items()):
+            if fam != family or (package is not None and pkg != package):
+                continue
+            selected = None
+            # Narrowest range first, so the intersections stay small
+            slices = [index.select(field, lo, hi) for field, (lo, hi) in bounds.items()]
+            for rows in sorted(slices, key=len):
+                if selected is None:
+                    selected = rows
+                else:
+                    selected = np.intersect1d(selected, rows, assume_unique=True)
+                if len(selected) == 0:
+                    break
+            if selected is None:
+                selected = np.arange(len(index.rows))
+            if "value" in index.sorted:
+                # Order by value; stable on the original (Part ID) order
+                values = np.empty(len(index.rows))
+                values[index.sorted["value"][1]] = index.sorted["value"][0]
+                selected = np.sort(selected)
+                selected = selected[np.argsort(values[selected], kind="stable")]
+            result.extend(index.rows[i] for i in selected)
+        return result
+
+
+def parse_range(text):
+    """'4k:5k' -> ("4k", "5k"), ':1%' -> (None, "1%"), '75V' -> ("75V", "75V")"""
+    if ":" not in text:
+        return text, text
+    lo, hi = text.split(":", 1)
+    return lo or None, hi or None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parametric search of the parts catalog")
+    parser.add_argument("family", help="Resistors, Capacitors, ...")
+    parser.add_argument("--dir", default=".", help="directory holding the catalog CSVs")
+    parser.add_argument("--package", help="only this package, e.g. 0603")
+    for field in fields:
+        parser.add_argument("--" + field, type=parse_range, help="range as min:max; either end optional")
+    args = parser.parse_args()
+
+    ranges = {f: getattr(args, f) for f in fields if getattr(args, f) is not None}
+    try:
+        rows = QueryEngine(Catalog(args.dir)).query(args.family, args.package, **ranges)
+    except ValueError as e:
+        parser.error(str(e))
+
+    writer = csv.writer(sys.stdout, quoting=csv.QUOTE_ALL)
+    if rows:
+        columns = [c for c in rows[0] if c != "Family"]
+        writer.writerow(columns)
+        writer.writerows([row[c] for c in columns] for row in rows)
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2025 Iain Waugh
+All rights reserved.
+
+Load sharded catalog CSVs into the SQLite database, reloading only what changed.
+
+The generators write shards with --shards (see ShardedCsvSink in sinks.py):
+
+    python make_res_csv.py --shards shards/Resistors
+    python shards.py kicad_parts.sqlite3 shards/Resistors shards/Capacitors
+
+The database keeps the SHA-256 of every shard it has loaded (in a '_shards'
+table).  A shard whose hash matches is skipped; a changed shard has its old
+rows deleted and its new rows inserted; a shard that's gone has its rows
+deleted.  If the shard key column changes, or the table's columns don't
+match the manifest's header (e.g. a table from before a column was added),
+the family is rebuilt from scratch.  Each family's table is created, in the
+same layout as make_sqlite_db.sh, if it doesn't exist yet.
+"""
+import argparse
+import csv
+import json
+import os
+import sqlite3
+
+
+def sync_family(conn, directory):
+    """
+    Bring one family's table up to date with the shards in 'directory'.
+
+    Returns the list of shard key values that were (re)loaded or removed.
+    """
+    with open(os.path.join(directory, "manifest.json")) as f:
+        manifest = json.load(f)
+    family = manifest["family"]
+    key = manifest["key"]
+    header = manifest["header"]
+
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS _shards "
+        "(family TEXT, key TEXT, shard TEXT, sha256 TEXT, PRIMARY KEY (family, shard))"
+    )
+
+    # If the table has different columns, or the family was sharded on a
+    # different column last time, start again
+    table_columns = [r[1] for r in conn.execute("PRAGMA table_info([" + family + "])")]
+    old_keys = {k for (k,) in conn.execute("SELECT key FROM _shards WHERE family = ?", (family,))}
+    if table_columns and table_columns != header:
+        conn.execute("DROP TABLE [" + family + "]")
+        conn.execute("DELETE FROM _shards WHERE family = ?", (family,))
+    elif old_keys - {key}:
+        conn.execute("DELETE FROM [" + family + "]")
+        conn.execute("DELETE FROM _shards WHERE family = ?", (family,))
+
+    columns = ["[" + header[0] + "] TEXT PRIMARY KEY"]
+    columns += ["[" + h + "] TEXT" for h in header[1:]]
+    conn.execute("CREATE TABLE IF NOT EXISTS [" + family + "] (" + ", ".join(columns) + ")")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS [" + family + " " + key + "] ON [" + family + "] ([" + key + "])"
+    )
+
+    loaded = dict(conn.execute("SELECT shard, sha256 FROM _shards WHERE family = ?", (family,)))
+    delete = "DELETE FROM [" + family + "] WHERE [" + key + "] = ?"
+    insert = "INSERT INTO [" + family + "] VALUES (" + ", ".join("?" * len(header)) + ")"
+    changed = [
+        shard
+        for shard, info in sorted(manifest["shards"].items())
+        if loaded.get(shard) != info["sha256"]
+    ]
+    removed = sorted(set(loaded) - set(manifest["shards"]))
+
+    # Delete everything first: a part can move from one changed shard to another
+    for shard in changed + removed:
+        conn.execute(delete, (shard,))
+    for shard in removed:
+        conn.execute("DELETE FROM _shards WHERE family = ? AND shard = ?", (family, shard))
+
+    for shard in changed:
+        info = manifest["shards"][shard]
+        with open(os.path.join(directory, info["file"]), newline="") as csv_file:
+            rows = list(csv.reader(csv_file))[1:]
+        conn.executemany(insert, rows)
+        conn.execute(
+            "INSERT OR REPLACE INTO _shards VALUES (?, ?, ?, ?)",
+            (family, key, shard, info["sha256"]),
+        )
+
+    return changed + removed
+
+
+def sync(db_filename, directories):
+    """Sync every family directory in one transaction; returns {family dir: changed shards}."""
+    conn = sqlite3.connect(db_filename)
+    try:
+        with conn:
+            return {d: sync_family(conn, d) for d in directories}
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load changed catalog shards into SQLite")
+    parser.add_argument("db", help="the SQLite database, e.g. kicad_parts.sqlite3")
+    parser.add_argument("directories", nargs="+", help="shard directories (with a manifest.json)")
+    args = parser.parse_args()
+
+    for directory, changed in sync(args.db, args.directories).items():
+        print(directory + ": " + (", ".join(changed) if changed else "up to date"))
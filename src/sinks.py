@@ -0,0 +1,332 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2025 Iain Waugh
+All rights reserved.
+
+Write one stream of generated rows to several output formats in a single pass.
+
+Each sink gets its own writer thread and a bounded queue.  The generator only
+runs once; if one sink is slow, its queue fills up and the generator waits for
+it rather than buffering the whole catalog in memory.
+
+Outputs only replace the previous ones if the whole run succeeds.  Files are
+written under a temporary name and renamed at the end, and the SQLite table
+is replaced in one transaction.  If the generator raises, every sink is
+aborted and the old outputs are left as they were.
+
+    sinks = [CsvSink("Resistors.csv"), SqliteSink("parts.sqlite3", "Resistors")]
+    fan_out(header, rows, sinks)
+"""
+import csv
+import hashlib
+import io
+import json
+import os
+import queue
+import re
+import sqlite3
+import threading
+
+
+class Sink:
+    """
+    Base class for an output; subclasses override open(), write(), close() and abort().
+
+    close() is only called when every row has been written; otherwise abort()
+    is called, and should leave any previous output untouched.
+    """
+
+    def open(self, header):
+        self.header = header
+
+    def write(self, rows):
+        """Write a batch (list) of rows."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def abort(self):
+        pass
+
+
+class FileSink(Sink):
+    """An output file, written as <filename>.tmp and renamed on success."""
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.tmp_filename = filename + ".tmp"
+
+    def close(self):
+        self.file.close()
+        os.replace(self.tmp_filename, self.filename)
+
+    def abort(self):
+        if getattr(self, "file", None) is not None:
+            self.file.close()
+        if os.path.exists(self.tmp_filename):
+            os.remove(self.tmp_filename)
+
+
+class CsvSink(FileSink):
+    """The QUOTE_ALL CSV that gets checked in to revision control."""
+
+    def open(self, header):
+        super().open(header)
+        self.file = open(self.tmp_filename, "w", newline="")
+        self.writer = csv.writer(self.file, quoting=csv.QUOTE_ALL)
+        self.writer.writerow(header)
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+
+
+class JsonLinesSink(FileSink):
+    """One JSON object per row, keyed by column name."""
+
+    def open(self, header):
+        super().open(header)
+        self.file = open(self.tmp_filename, "w", encoding="utf-8")
+
+    def write(self, rows):
+        for row in rows:
+            self.file.write(json.dumps(dict(zip(self.header, row)), ensure_ascii=False))
+            self.file.write("\n")
+
+
+class SqliteSink(Sink):
+    """
+    A table in a SQLite database, in the same layout as make_sqlite_db.sh.
+
+    All columns are TEXT and the first column (the Part ID) is the primary key.
+    An existing table of the same name is replaced, in the same transaction
+    as the new rows are added, so an aborted run leaves the old table alone.
+    """
+
+    def __init__(self, filename, table):
+        self.filename = filename
+        self.table = table
+
+    def open(self, header):
+        super().open(header)
+        # The connection is created in the writer thread, which is where it's used
+        # Manage the transaction here; Python's sqlite3 would commit the DROP at once
+        self.conn = sqlite3.connect(self.filename, isolation_level=None)
+        self.conn.execute("BEGIN")
+        columns = ["[" + header[0] + "] TEXT PRIMARY KEY"]
+        columns += ["[" + h + "] TEXT" for h in header[1:]]
+        self.conn.execute("DROP TABLE IF EXISTS [" + self.table + "]")
+        self.conn.execute("CREATE TABLE [" + self.table + "] (" + ", ".join(columns) + ")")
+        self.insert = (
+            "INSERT INTO [" + self.table + "] VALUES (" + ", ".join("?" * len(header)) + ")"
+        )
+
+    def write(self, rows):
+        self.conn.executemany(self.insert, rows)
+
+    def close(self):
+        self.conn.execute("COMMIT")
+        self.conn.close()
+
+    def abort(self):
+        if getattr(self, "conn", None) is not None:
+            if self.conn.in_transaction:
+                self.conn.execute("ROLLBACK")
+            self.conn.close()
+
+
+class ParquetSink(FileSink):
+    """
+    A columnar (Parquet) file, written one row group per batch.
+
+    Needs 'pyarrow', which is only imported when this sink is used.
+    """
+
+    def open(self, header):
+        super().open(header)
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.pa = pa
+        self.schema = pa.schema([(h, pa.string()) for h in header])
+        self.writer = pq.ParquetWriter(self.tmp_filename, self.schema)
+
+    def write(self, rows):
+        columns = [list(col) for col in zip(*rows)]
+        self.writer.write_table(self.pa.Table.from_arrays(columns, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+        os.replace(self.tmp_filename, self.filename)
+
+    def abort(self):
+        if getattr(self, "writer", None) is not None:
+            self.writer.close()
+        if os.path.exists(self.tmp_filename):
+            os.remove(self.tmp_filename)
+
+
+class ShardedCsvSink(Sink):
+    """
+    One QUOTE_ALL CSV per value of a key column (the package, by default).
+
+    The files go in 'directory', named <family>-<key value>.csv, with the rows
+    of each file sorted by their first column (the Part ID).  A manifest.json
+    lists each shard's file, row count and SHA-256, so that loaders can skip
+    shards that haven't changed (see shards.py).  Shards whose contents
+    haven't changed aren't rewritten, and shards that have gone are deleted.
+
+    Nothing is written until the whole stream has arrived: an aborted run
+    leaves the directory (shards and manifest) exactly as it was.
+    """
+
+    def __init__(self, directory, family, key="Package"):
+        self.directory = directory
+        self.family = family
+        self.key = key
+
+    def open(self, header):
+        super().open(header)
+        self.key_col = header.index(self.key)
+        self.shards = {}
+
+    def write(self, rows):
+        for row in rows:
+            self.shards.setdefault(row[self.key_col], []).append(row)
+
+    def abort(self):
+        self.shards = {}
+
+    def replace_file(self, path, data):
+        """Write 'data' to 'path' via a temporary file, so readers never see half a file."""
+        with open(path + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(path + ".tmp", path)
+
+    def filename(self, key_value):
+        # Keep file names portable, whatever is in the key column
+        return self.family + "-" + re.sub(r"[^\w.-]", "_", key_value) + ".csv"
+
+    def close(self):
+        os.makedirs(self.directory, exist_ok=True)
+        manifest_file = os.path.join(self.directory, "manifest.json")
+        try:
+            with open(manifest_file) as f:
+                old_shards = json.load(f)["shards"]
+        except (FileNotFoundError, ValueError, KeyError):
+            old_shards = {}
+
+        manifest = {"family": self.family, "key": self.key, "header": self.header, "shards": {}}
+        for key_value in sorted(self.shards):
+            rows = sorted(self.shards[key_value], key=lambda row: row[0])
+            text = io.StringIO(newline="")
+            writer = csv.writer(text, quoting=csv.QUOTE_ALL)
+            writer.writerow(self.header)
+            writer.writerows(rows)
+            data = text.getvalue().encode("utf-8")
+            sha256 = hashlib.sha256(data).hexdigest()
+
+            filename = self.filename(key_value)
+            path = os.path.join(self.directory, filename)
+            old = old_shards.get(key_value, {})
+            if old.get("sha256") != sha256 or not os.path.exists(path):
+                self.replace_file(path, data)
+            manifest["shards"][key_value] = {"file": filename, "rows": len(rows), "sha256": sha256}
+
+        text = json.dumps(manifest, indent=2, sort_keys=True) + "\n"
+        self.replace_file(manifest_file, text.encode("utf-8"))
+
+        # Only once the new manifest is in place, remove shards that have gone
+        for key_value, old in old_shards.items():
+            if key_value not in manifest["shards"]:
+                path = os.path.join(self.directory, old["file"])
+                if os.path.exists(path):
+                    os.remove(path)
+
+
+# Queue markers for the end of the rows
+_done = object()
+_abort = object()
+
+
+def _drain(sink, header, q, errors):
+    """Writer thread: write batches from the queue until an end marker arrives."""
+    failed = False
+    try:
+        sink.open(header)
+    except Exception as e:
+        errors.append(e)
+        failed = True
+    while True:
+        batch = q.get()
+        if batch is _done or batch is _abort:
+            break
+        if failed:
+            # Keep draining so that the generator never blocks on a dead sink
+            continue
+        try:
+            sink.write(batch)
+        except Exception as e:
+            errors.append(e)
+            failed = True
+
+    try:
+        if failed or batch is _abort:
+            sink.abort()
+        else:
+            sink.close()
+    except Exception as e:
+        if not failed:
+            errors.append(e)
+
+
+def fan_out(header, rows, sinks, batch_size=512, max_batches=8):
+    """
+    Send every row from 'rows' to every sink, generating the rows only once.
+
+    header     : list of column names
+    rows       : any iterable of row lists (usually a generator)
+    sinks      : list of Sink objects
+    batch_size : rows passed to a sink in one go
+    max_batches: size of each sink's queue; a full queue makes the generator wait
+
+    Returns the number of rows written.  If any sink fails, that sink is
+    aborted, the other sinks still finish and the first error is raised at
+    the end.  If the generator raises, every sink is aborted and the
+    generator's exception is raised.
+    """
+    errors = []
+    queues = []
+    threads = []
+    for sink in sinks:
+        q = queue.Queue(maxsize=max_batches)
+        t = threading.Thread(target=_drain, args=(sink, header, q, errors), daemon=True)
+        t.start()
+        queues.append(q)
+        threads.append(t)
+
+    count = 0
+    batch = []
+    end = _abort
+    try:
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                for q in queues:
+                    q.put(batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            for q in queues:
+                q.put(batch)
+            count += len(batch)
+        end = _done
+    finally:
+        for q in queues:
+            q.put(end)
+        for t in threads:
+            t.join()
+
+    if errors:
+        raise errors[0]
+    return count
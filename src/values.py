@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) 2025 Iain Waugh
+All rights reserved.
+
+Convert whole columns of values at once, using pandas/NumPy string operations.
+
+These are the column versions of schem2text() and str2numeric() in parts.py,
+for when you want to sort, filter or summarise the 'Value' column of a catalog
+without a Python call per row.
+
+The same 3 representations of values are used:
+    Schematic value (string): 4R7, 10M, 1k5, 4p7, etc.
+    Text value      (string): 4.7, 10M, 1.5k, 4.7p, etc.
+    Numeric value   (number): 4.7, 10000000, 1500, 4.7e-12, etc.
+
+Both schematic and text values are accepted as input, with or without a
+trailing unit ("4.7pF", "100nH"), so capacitor values like "1.0uF" work too.
+
+Run this file to check that numbers survive a round trip through the strings,
+optionally over the Value columns of some catalog CSVs:
+
+    python values.py Resistors.csv Capacitors.csv
+"""
+import argparse
+import csv
+import sys
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+
+# SI prefix -> power of 10.  "R" is the resistor's decimal point (4R7 = 4.7).
+prefix_exponent = {
+    "a": -18,
+    "f": -15,
+    "p": -12,
+    "n": -9,
+    "u": -6,
+    "m": -3,
+    "R": 0,
+    "": 0,
+    "k": 3,
+    "M": 6,
+    "G": 9,
+}
+
+# Used when turning numbers back into strings
+exponent_prefix = {e: p for p, e in prefix_exponent.items() if p != "R"}
+
+# Integer part, then either ".frac" + prefix (text) or prefix + frac (schematic)
+value_regex = (
+    r"^(?P<int>\d*)"
+    r"(?:\.(?P<frac>\d+))?"
+    r"(?P<prefix>[afpnumRkMG]?)"
+    r"(?P<frac2>\d*)"
+    r"(?:[FH]|OHM|Ohm)?$"
+)
+
+
+def _unique(values):
+    """
+    Return (codes, uniques) for a column of values.
+
+    A catalog has a few thousand distinct values spread over many rows, so the
+    string work is done once per distinct value and then expanded with 'codes'.
+    """
+    return pd.factorize(np.asarray(values, dtype=object), use_na_sentinel=False)
+
+
+def _split(values):
+    """Split a column of value strings into mantissa digits and exponents."""
+    s = pd.Series(values, dtype="string").str.replace(" ", "", regex=False)
+    parts = s.str.extract(value_regex)
+    frac = parts["frac"].fillna("") + parts["frac2"].fillna("")
+    mantissa = parts["int"].fillna("").str.cat(frac, sep=".")
+    # "4R" -> "4.", ".5" -> ".5"; an empty mantissa isn't a number
+    bad = parts["int"].isna() | (mantissa == ".")
+    bad |= parts["frac"].notna() & (parts["frac2"] != "")
+    exponent = parts["prefix"].map(prefix_exponent)
+    return mantissa, exponent, bad
+
+
+def to_numeric(values, exact=False):
+    """
+    Convert value strings ("4k7", "1R0", "22M", "100nF") to numbers.
+
+    Returns a float64 array, with NaN for anything that isn't a value.
+    With exact=True, returns an object array of Decimal instead, so that
+    "8k2" is exactly 8200 and not 8199.999999999999.
+    """
+    codes, uniques = _unique(values)
+    mantissa, exponent, bad = _split(uniques)
+    if exact:
+        result = np.empty(len(mantissa), dtype=object)
+        for i, (m, e, b) in enumerate(zip(mantissa, exponent, bad)):
+            result[i] = Decimal("NaN") if b else Decimal(m.rstrip(".") or "0").scaleb(int(e))
+        return result[codes]
+
+    # Let the float parser apply the exponent ("4.7e3") so that the result is
+    # correctly rounded, rather than multiplying 4.7 * 1000 in floating point
+    sci = mantissa.str.cat(exponent.astype("Int64").astype("string"), sep="e")
+    sci = sci.mask(bad)
+    result = pd.to_numeric(sci, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    return result[codes]
+
+
+def _scale(numbers, digits):
+    """
+    Split (unique) numbers into a rounded mantissa string and an SI exponent.
+
+    The mantissa is fixed point with trailing zeros removed, like "4.7" or "470".
+    Raises ValueError for numbers outside the range of the SI prefixes.
+    """
+    x = np.asarray(numbers, dtype=float)
+    nonzero = np.isfinite(x) & (x != 0)
+    mag = np.zeros(x.shape, dtype=int)
+    mag[nonzero] = np.floor(np.log10(np.abs(x[nonzero]))).astype(int)
+
+    # Rounding can carry into the next power of 10 (999.7 -> 1000)
+    rounded = np.round(x / 10.0**mag, digits - 1) * 10.0**mag
+    mag[nonzero] = np.floor(np.log10(np.abs(rounded[nonzero]))).astype(int)
+
+    exp = mag - np.mod(mag, 3)
+    out_of_range = (exp < min(exponent_prefix)) | (exp > max(exponent_prefix))
+    if np.any(out_of_range):
+        raise ValueError(
+            "Values outside the range of the SI prefixes: " + str(x[out_of_range][:5])
+        )
+
+    # Enough decimal places for 'digits' significant figures, then tidy up
+    decimals = np.maximum(digits - 1 - (mag - exp), 0)
+    formats = np.char.add(np.char.add("%.", decimals.astype(str)), "f")
+    mantissa = np.char.mod(formats, rounded / 10.0**exp)
+    has_dot = np.char.find(mantissa, ".") >= 0
+    mantissa = np.where(has_dot, np.char.rstrip(np.char.rstrip(mantissa, "0"), "."), mantissa)
+    return mantissa, exp, np.isfinite(x)
+
+
+def to_text(numbers, digits=3):
+    """Convert numbers to text values: 4700 -> "4.7k", 1 -> "1", 22e6 -> "22M"."""
+    if np.size(numbers) == 0:
+        return np.array([], dtype=str)
+    uniques, codes = np.unique(np.asarray(numbers, dtype=float), return_inverse=True)
+    mantissa, exp, ok = _scale(uniques, digits)
+    prefix = np.vectorize(exponent_prefix.get, otypes=[str])(exp)
+    return np.where(ok, np.char.add(mantissa, prefix), "")[codes]
+
+
+def to_schematic(numbers, digits=3, unity="R"):
+    """
+    Convert numbers to schematic values: 4700 -> "4k7", 1 -> "1R", 22e6 -> "22M".
+
+    'unity' is the character used as the decimal point when there is no SI
+    prefix; "R" for resistors.  Pass unity="" for other parts to get "4.7".
+    """
+    if np.size(numbers) == 0:
+        return np.array([], dtype=str)
+    uniques, codes = np.unique(np.asarray(numbers, dtype=float), return_inverse=True)
+    mantissa, exp, ok = _scale(uniques, digits)
+    prefix = np.vectorize(exponent_prefix.get, otypes=[str])(exp)
+    prefix = np.where(prefix == "", unity, prefix)
+
+    # Put the prefix where the decimal point is, or on the end
+    has_dot = np.char.find(mantissa, ".") >= 0
+    head = np.char.partition(mantissa, ".")
+    with_dot = np.char.add(np.char.add(head[..., 0], prefix), head[..., 2])
+    no_dot = np.char.add(mantissa, prefix)
+    result = np.where(has_dot, with_dot, no_dot)
+    # With no prefix character, there's nowhere to hide the decimal point
+    result = np.where(has_dot & (prefix == ""), mantissa, result)
+    return np.where(ok, result, "")[codes]
+
+
+def schem2text(values):
+    """Column version of schem2text(): "4k7" -> "4.7k", "1R" -> "1", "22M" -> "22M"."""
+    codes, uniques = _unique(values)
+    s = pd.Series(uniques, dtype="string")
+    s = s.str.replace(r"^(\d+)([afpnumRkMG])(\d+)", r"\1.\3\2", regex=True)
+    s = s.str.replace(r"R$", "", regex=True)
+    return s.to_numpy(dtype=object)[codes]
+
+
+def round_trip_errors(numbers, digits=3):
+    """
+    Return the numbers that don't parse back as themselves from to_schematic()
+    or to_text().  Only numbers with at most 'digits' significant figures are
+    checked, since the others are rounded.
+    """
+    x = np.asarray(numbers, dtype=float)
+    x = x[np.isfinite(x)]
+    x = x[[float("%.*g" % (digits, n)) == n for n in x]]
+    bad = np.zeros(len(x), dtype=bool)
+    for strings in (to_schematic(x, digits), to_text(x, digits)):
+        bad |= to_numeric(strings) != x
+    return x[bad]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that value conversions round trip")
+    parser.add_argument("csv_files", nargs="*", help="catalog CSVs whose Value columns to check")
+    args = parser.parse_args()
+
+    # Values that have caught the formatting out before: exponents, carries, empty
+    checks = {
+        "built in": [0, 1, 4.7, 10, 100, 470, 999.7, 1e5, 4.7e-12, 8.2e3, 1.5e-18, 220e9],
+        "empty": [],
+    }
+    for filename in args.csv_files:
+        with open(filename, newline="") as csv_file:
+            checks[filename] = to_numeric([row["Value"] for row in csv.DictReader(csv_file)])
+
+    failed = False
+    for name, numbers in checks.items():
+        for digits in range(1, 5):
+            errors = round_trip_errors(numbers, digits)
+            if len(errors):
+                failed = True
+                print(name + ", " + str(digits) + " digits: " + str(len(errors)) + " wrong")
+                print("    e.g. " + str(errors[:5]))
+    print("FAILED" if failed else "OK")
+    sys.exit(1 if failed else 0)